@@ -15,17 +15,54 @@ Usage:
   python3 scripts/apply_theme.py --init    # Create initial snapshot from current configs
 """
 
+import functools
+import hashlib
+import io
 import json
+import mmap
+import os
+import re
 import sys
 import shutil
+import tarfile
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Match, Optional, Pattern, Sequence, Tuple, Union
+
+try:
+    import hyperscan  # optional: SIMD multi-literal prefilter, preferred when available
+except ImportError:
+    hyperscan = None
+
+try:
+    import ahocorasick  # optional: pyahocorasick, one-pass multi-value prefilter
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # optional: faster theme/snapshot (de)serialization
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard  # optional: .tar.zst backups, .tar.gz otherwise
+except ImportError:
+    zstandard = None
+
+# File contents as seen by the prefilter
+Buffer = Union[bytes, mmap.mmap]
+# A change as (old bytes, new bytes, old str, new str), converted once per run
+Needle = Tuple[bytes, bytes, str, str]
 
 ROOT = Path(__file__).resolve().parents[1]
 THEME_FILE = ROOT / "theme.json"
 SNAPSHOT_FILE = ROOT / "theme.snapshot.json"
 BACKUP_DIR = ROOT / ".theme_backups"
+FILELIST_CACHE = BACKUP_DIR / ".filelist.cache"
 
 # Directories to search for theme values
 CONFIG_DIRS = [
@@ -41,96 +78,259 @@ INCLUDE_PATTERNS = [
     "*.css", "*.conf", "*.py", "*.rs", "*.toml", "*.json", "*.html", "*.js",
     "*.jsx", "*.tsx", "*.md", "*.yaml", "*.yml", "*.ini", "*.sh", "*.zsh", "*.bash",
     "*.lua", "*.vim", "*.vimrc", "*.properties", "*.xml", "*.plist", "*.scss", "*.sass",
-    "*.less", "*.yew", "*.java", "*.kt", "*.gradle", "*.yaml", "*.yml", "*.ps1",
-    "*.rs", "*.c", "*.h", "*.cpp", "*.hpp", "*.cs",
+    "*.less", "*.yew", "*.java", "*.kt", "*.gradle", "*.ps1",
+    "*.c", "*.h", "*.cpp", "*.hpp", "*.cs",
 ]
 
+# Each pool worker gets at least this many files; smaller runs stay in-process
+MIN_FILES_PER_WORKER = 32
+
+# Files larger than this are skipped without being read
+MAX_FILE_SIZE = 2_000_000
+# Bytes sniffed for NUL to detect binary files
+SNIFF_SIZE = 4096
+
+# Suffixes matched by INCLUDE_PATTERNS, for a single str.endswith() call per file
+SUFFIXES = tuple(dict.fromkeys(p[1:] for p in INCLUDE_PATTERNS))
+
+# Exclude backups, build artifacts, IDE and OS dirs, caches, virtualenvs, package outputs.
+# Matched against directory names during the walk, so excluded dirs are never descended into.
+EXCLUDED_DIRS = frozenset({
+    ".theme_backups",
+    "target",
+    "build",
+    "node_modules",
+    "dist",
+    ".git",
+    "configs_out",
+    "pkg",
+    ".venv",
+    "venv",
+    ".cache",
+    ".gradle",
+    ".idea",
+    ".vscode",
+    "__pycache__",
+    ".parcel-cache",
+    ".next",
+    "out",
+    "dist-packages",
+    "CMakeFiles",
+    "cmake-build-debug",
+    "vendor",
+    ".tox",
+    ".mypy_cache",
+    "coverage",
+    "coverage_html_report",
+    ".pytest_cache",
+})
+
+# File names to skip wherever they appear
+EXCLUDED_FILES = frozenset({
+    "build.rs",
+    ".DS_Store",
+})
+
+# Resolved once; walked paths are already under the resolved ROOT
+SELF_PATH = str(Path(__file__).resolve())
+
+# [second, "HH:MM:SS"] of the last log line, reformatted only when the second changes
+_log_time = [0, ""]
+
+def format_log(msg: str, level: str = "INFO") -> str:
+    now = int(time.time())
+    if now != _log_time[0]:
+        _log_time[0] = now
+        _log_time[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return f"[{_log_time[1]}] {level}: {msg}"
+
 def log(msg: str, level: str = "INFO"):
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    print(f"[{timestamp}] {level}: {msg}")
+    print(format_log(msg, level))
 
 def flatten_dict(d: Dict, parent_key: str = "", sep: str = ".") -> Dict[str, Any]:
     """Flatten nested dict into dotted keys."""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
+    flat: Dict[str, Any] = {}
+    # Stack of (key prefix, items iterator); resuming iterators keeps key order
+    stack = [(parent_key, iter(d.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            new_key = f"{prefix}{sep}{k}" if prefix else k
+            if isinstance(v, dict):
+                stack.append((new_key, iter(v.items())))
+                break
+            flat[new_key] = v
         else:
-            items.append((new_key, v))
-    return dict(items)
+            stack.pop()
+    return flat
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON with orjson when available, the stdlib otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize to 2-space indented JSON with orjson when available, the stdlib otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
 
 def load_theme() -> Dict:
     """Load and flatten theme.json."""
-    with THEME_FILE.open() as f:
-        theme = json.load(f)
-    return flatten_dict(theme)
+    return flatten_dict(json_loads(THEME_FILE.read_bytes()))
 
 def load_snapshot() -> Dict:
     """Load theme snapshot (previous state)."""
     if not SNAPSHOT_FILE.exists():
         return {}
-    with SNAPSHOT_FILE.open() as f:
-        return json.load(f)
+    return json_loads(SNAPSHOT_FILE.read_bytes())
 
 def save_snapshot(theme: Dict):
     """Save current theme as snapshot."""
-    with SNAPSHOT_FILE.open("w") as f:
-        json.dump(theme, f, indent=2)
+    SNAPSHOT_FILE.write_bytes(json_dumps(theme))
     log(f"Saved snapshot to {SNAPSHOT_FILE.name}")
 
-def find_config_files() -> List[Path]:
-    """Find all config files to process by searching the whole repo, excluding common dirs."""
-    files = []
-    # Exclude backups, build artifacts, IDE and OS dirs, caches, virtualenvs, package outputs
-    excluded = {
-        ".theme_backups",
-        "target",
-        "build",
-        "node_modules",
-        "dist",
-        ".git",
-        "configs_out",
-        "pkg",
-        ".venv",
-        "venv",
-        ".cache",
-        ".gradle",
-        ".idea",
-        ".vscode",
-        "__pycache__",
-        "node_modules",
-        ".parcel-cache",
-        ".next",
-        "out",
-        "dist-packages",
-        "target",
-        "build.rs",
-        ".DS_Store",
-        "CMakeFiles",
-        "cmake-build-debug",
-        "vendor",
-        "venv",
-        ".tox",
-        ".mypy_cache",
-        "coverage",
-        "coverage_html_report",
-        ".pytest_cache",
-    }
-
-    for pattern in INCLUDE_PATTERNS:
-        for f in ROOT.rglob(pattern):
-            # skip files in excluded directories
-            if any(ex in f.parts for ex in excluded):
-                continue
-            # skip this script and snapshot/backups
-            if f.resolve() == Path(__file__).resolve():
-                continue
-            files.append(f)
+def _walk(dirpath: str, dirs: Dict[str, int]) -> Iterator[str]:
+    """Yield candidate file paths under dirpath, pruning excluded directories.
+
+    Records the mtime of every directory visited in dirs, to validate the file list cache.
+    """
+    try:
+        dirs[dirpath] = os.stat(dirpath).st_mtime_ns
+        it = os.scandir(dirpath)
+    except PermissionError:
+        # Skip unreadable dirs, as rglob did; -1 never matches, so the cache is rebuilt next run
+        dirs[dirpath] = -1
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in EXCLUDED_DIRS:
+                    yield from _walk(entry.path, dirs)
+            elif _is_candidate(entry):
+                yield entry.path
+
+def _is_candidate(entry: os.DirEntry) -> bool:
+    """Whether a non-directory entry is a config file to process."""
+    name = entry.name
+    if name in EXCLUDED_FILES or not name.endswith(SUFFIXES):
+        return False
+    # skip this script; only symlinks need a realpath() to compare
+    return not (entry.path == SELF_PATH or (entry.is_symlink() and os.path.realpath(entry.path) == SELF_PATH))
+
+def _filelist_key() -> str:
+    """Fingerprint of the walk settings; a cache built with other settings is ignored."""
+    spec = repr((INCLUDE_PATTERNS, sorted(EXCLUDED_DIRS), sorted(EXCLUDED_FILES)))
+    return hashlib.sha1(spec.encode()).hexdigest()
+
+def _load_filelist_cache() -> Optional[Tuple[Dict[str, int], List[str]]]:
+    """Load the cached walk as ({dir: mtime_ns}, files), or None if missing, stale or damaged."""
+    try:
+        data = FILELIST_CACHE.read_bytes()
+    except OSError:
+        return None
+    # Paths are stored as raw os.fsencode() bytes, so only split on b"\n"
+    lines = data.split(b"\n")
+    if len(lines) < 3 or lines.pop() != b"" or lines[0] != _filelist_key().encode():
+        return None
+
+    root = str(ROOT)
+    dirs: Dict[str, int] = {}
+    files: List[str] = []
+    try:
+        for line in lines[1:-1]:
+            kind, _, rest = line.partition(b" ")
+            if kind == b"D":
+                mtime, _, rel = rest.partition(b" ")
+                dirs[os.path.normpath(os.path.join(root, os.fsdecode(rel)))] = int(mtime)
+            elif kind == b"F":
+                files.append(os.path.join(root, os.fsdecode(rest)))
+            else:
+                return None
+    except ValueError:
+        return None
+    # A truncated or hand-edited cache must not silently drop files
+    if lines[-1] != f"END {len(dirs)} {len(files)}".encode():
+        return None
+    return dirs, files
+
+def _save_filelist_cache(dirs: Dict[str, int], files: List[str]):
+    """Persist the walk as a key line, "D <mtime_ns> <dir>" and "F <file>" lines relative
+    to ROOT, and an "END <dirs> <files>" line the loader checks for completeness.
+
+    Paths are written with os.fsencode() so any name the walk returns round-trips,
+    including ones that are not valid UTF-8.
+    """
+    lines = [_filelist_key().encode()]
+    lines.extend(b"D %d %s" % (mtime, os.fsencode(os.path.relpath(d, ROOT))) for d, mtime in dirs.items())
+    lines.extend(b"F " + os.fsencode(os.path.relpath(f, ROOT)) for f in files)
+    lines.append(f"END {len(dirs)} {len(files)}".encode())
+    write_atomic(FILELIST_CACHE, b"\n".join(lines) + b"\n")
+
+def _dirs_unchanged(dirs: Dict[str, int]) -> bool:
+    # Adding, removing or renaming an entry bumps its parent's mtime, so
+    # stat-ing the walked dirs is enough to tell the file list is still valid
+    try:
+        return all(os.stat(d).st_mtime_ns == mtime for d, mtime in dirs.items())
+    except OSError:
+        return False
+
+def _dir_mtime(d: str) -> Optional[int]:
+    try:
+        return os.stat(d).st_mtime_ns
+    except OSError:
+        return None
+
+def refresh_filelist_cache(stamps: Dict[str, Tuple[Optional[int], Optional[int]]]):
+    """Re-stamp directories changed only by our own writes so they don't invalidate the cache.
+
+    stamps maps a directory to its mtime (before our first write, after our last
+    write). A directory is re-stamped only if the cache still records the
+    "before" mtime and a fresh one-level listing matches the cached entries;
+    otherwise it keeps its stale mtime and the next run re-walks, so entries
+    added by anyone else during the run are never hidden.
+    """
+    cached = _load_filelist_cache()
+    if cached is None:
+        return
+    dirs, files = cached
+    for d, (before, after) in stamps.items():
+        if before is None or after is None or dirs.get(d) != before:
+            continue
+        # mtime first: anything that changes d after this stat bumps it past the stamp
+        mtime = _dir_mtime(d)
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = {e.path for e in entries if e.is_dir(follow_symlinks=False) and e.name not in EXCLUDED_DIRS}
+        listed = {e.path for e in entries if not e.is_dir(follow_symlinks=False) and _is_candidate(e)}
+        if (mtime is not None
+                and subdirs == {p for p in dirs if p != d and os.path.dirname(p) == d}
+                and listed == {f for f in files if os.path.dirname(f) == d}):
+            dirs[d] = mtime
+    _save_filelist_cache(dirs, files)
+
+def find_config_files(persist: bool = True) -> List[Path]:
+    """Find all config files to process by searching the whole repo, excluding common dirs.
+
+    The result is cached in FILELIST_CACHE and reused while no walked directory has changed.
+    With persist=False (dry runs) an existing cache is used but nothing is written.
+    """
+    cached = _load_filelist_cache()
+    if cached is not None and _dirs_unchanged(cached[0]):
+        return [Path(p) for p in cached[1]]
 
-    # Deduplicate
-    unique_files = list(dict.fromkeys(files))
-    return unique_files
+    if persist:
+        # Create the cache dir before walking so it doesn't bump ROOT's mtime afterwards
+        BACKUP_DIR.mkdir(exist_ok=True)
+    dirs: Dict[str, int] = {}
+    files = list(_walk(str(ROOT), dirs))
+    if persist:
+        _save_filelist_cache(dirs, files)
+    return [Path(p) for p in files]
 
 def get_changes(old_theme: Dict, new_theme: Dict) -> List[Tuple[str, Any, Any]]:
     """Find what changed between old and new theme."""
@@ -141,46 +341,180 @@ def get_changes(old_theme: Dict, new_theme: Dict) -> List[Tuple[str, Any, Any]]:
             changes.append((key, old_value, new_value))
     return changes
 
-def backup_file(filepath: Path):
-    """Create backup of file before modifying."""
+def backup_files(originals: List[Tuple[Path, bytes]]) -> Path:
+    """Archive original contents of files before modifying them. Returns the archive path.
+
+    Everything goes into one .tar.zst (or .tar.gz without zstandard) per run,
+    written sequentially, instead of one copy per file.
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = BACKUP_DIR / timestamp / filepath.relative_to(ROOT)
-    backup_path.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(filepath, backup_path)
+    BACKUP_DIR.mkdir(exist_ok=True)
+
+    def add_all(tf: tarfile.TarFile):
+        for filepath, data in originals:
+            st = filepath.stat()
+            info = tarfile.TarInfo(str(filepath.relative_to(ROOT)))
+            info.size = len(data)
+            info.mtime = int(st.st_mtime)
+            info.mode = st.st_mode & 0o7777
+            tf.addfile(info, io.BytesIO(data))
+
+    # Exclusive create, so runs within the same second never overwrite each other
+    suffix = ".tar.zst" if zstandard is not None else ".tar.gz"
+    n = 0
+    while True:
+        archive = BACKUP_DIR / (f"{timestamp}{suffix}" if n == 0 else f"{timestamp}_{n}{suffix}")
+        try:
+            out = archive.open("xb")
+            break
+        except FileExistsError:
+            n += 1
 
-def apply_replacements(filepath: Path, changes: List[Tuple[str, Any, Any]], dry_run: bool = False) -> int:
-    """Apply theme changes to a file. Returns number of replacements made."""
     try:
-        content = filepath.read_text()
-        original_content = content
-        replacements = 0
-        
-        for key, old_val, new_val in changes:
-            # Convert values to strings for replacement
-            old_str = str(old_val)
-            new_str = str(new_val)
-            
-            # Skip if old value not in file
-            if old_str not in content:
-                continue
-            
-            # Count occurrences
-            count = content.count(old_str)
-            if count > 0:
-                if not dry_run:
-                    content = content.replace(old_str, new_str)
-                replacements += count
-                log(f"  {filepath.relative_to(ROOT)}: {old_str} → {new_str} ({count}x)", "CHANGE")
-        
-        # Write changes
-        if replacements > 0 and not dry_run:
-            backup_file(filepath)
-            filepath.write_text(content)
+        with out:
+            if zstandard is not None:
+                with zstandard.ZstdCompressor().stream_writer(out) as z, tarfile.open(fileobj=z, mode="w|") as tf:
+                    add_all(tf)
+            else:
+                with tarfile.open(fileobj=out, mode="w:gz") as tf:
+                    add_all(tf)
+    except BaseException:
+        archive.unlink(missing_ok=True)
+        raise
+    return archive
+
+def encode_changes(changes: List[Tuple[str, Any, Any]]) -> Tuple[Needle, ...]:
+    """Convert (old, new) values once per run, as bytes for matching and str for logging."""
+    needles = []
+    for _, old_val, new_val in changes:
+        old_str, new_str = str(old_val), str(new_val)
+        needles.append((old_str.encode(), new_str.encode(), old_str, new_str))
+    return tuple(needles)
+
+def build_matcher(needles: Sequence[Needle]) -> Callable[[Buffer], bool]:
+    """Build a function telling whether any old value occurs in raw content (bytes or mmap).
+
+    Stops at the first hit. Hyperscan and Aho-Corasick report the first match
+    by position in the file; the bytes.find fallback tries needles in order,
+    so with needles sorted longest first it tries the most distinctive first.
+    """
+    olds = [needle[0] for needle in needles]
+    if not all(olds):
+        # an empty value occurs everywhere (and hyperscan rejects it)
+        return lambda raw: True
+
+    if hyperscan is not None:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[re.escape(old) for old in olds],
+            ids=list(range(len(olds))),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(olds),
+        )
+
+        def _hs_match(raw: Buffer) -> bool:
+            try:
+                # returning True from the handler stops the scan at the first hit
+                db.scan(raw, match_event_handler=lambda *_: True)
+            except hyperscan.ScanTerminated:
+                return True
+            return False
+
+        return _hs_match
+
+    if ahocorasick is None:
+        return lambda raw: any(raw.find(old) >= 0 for old in olds)
+
+    # pyahocorasick matches str; latin-1 maps bytes 1:1 without any validation
+    automaton = ahocorasick.Automaton()
+    for old in olds:
+        automaton.add_word(old.decode("latin-1"), None)
+    automaton.make_automaton()
+    return lambda raw: next(automaton.iter(str(raw, "latin-1")), None) is not None
+
+def write_atomic(filepath: Path, data: bytes):
+    """Write data to a fresh temp file next to filepath, fsync it and os.replace() it into place."""
+    # Replace the real file, not a symlink pointing at it
+    target = filepath.resolve()
+    # Unique name, so existing files and concurrent runs are never clobbered
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if target.exists():
+            shutil.copymode(target, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+# Per-process matcher, built by _init_worker (matchers are not picklable)
+_matcher: Optional[Callable[[Buffer], bool]] = None
+
+def _init_worker(needles: Sequence[Needle]):
+    global _matcher
+    _matcher = build_matcher(needles)
+
+def build_replacer(needles: Sequence[Needle]) -> Tuple[Pattern[bytes], Dict[bytes, Needle]]:
+    """Compile all old values into one alternation plus a map from old value to its needle.
+
+    needles must be sorted longest first so a value that prefixes another
+    (#fff / #ffffff) never splits it.
+    """
+    mapping: Dict[bytes, Needle] = {}
+    for needle in needles:
+        # first change wins for duplicate old values
+        mapping.setdefault(needle[0], needle)
+    alternation = b"|".join(re.escape(old) for old in mapping)
+    return re.compile(alternation), mapping
+
+def apply_replacements(filepath: Path, pattern: Pattern[bytes], mapping: Dict[bytes, Needle], dry_run: bool = False) -> Tuple[int, List[Tuple[str, str]], Optional[Tuple[bytes, bytes]]]:
+    """Compute theme changes for a file. Returns replacements made, log lines and the edit.
+
+    Runs in worker processes, so log lines are returned as (msg, level) for the
+    main process to print instead of being logged directly. The edit is
+    (original, new) contents, or None if the file is unchanged or on a dry run;
+    the main process backs up all originals before writing any of them.
+    """
+    lines = []
+    try:
+        # Cheap metadata check first: config files never get this large
+        size = filepath.stat().st_size
+        if size == 0 or size > MAX_FILE_SIZE:
+            return 0, lines, None
+        # Prefilter on a read-only mapping; only pages the scan touches are read,
+        # and contents are copied out only once a hit is confirmed
+        with filepath.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # NUL in the header means binary
+            if mm.find(b"\x00", 0, SNIFF_SIZE) >= 0:
+                return 0, lines, None
+            # Single pass to find whether any old value occurs at all; most files have none
+            if not _matcher(mm):
+                return 0, lines, None
+            raw = mm[:]
+
+        counts: Counter[bytes] = Counter()
+
+        def substitute(m: Match[bytes]) -> bytes:
+            old = m.group(0)
+            counts[old] += 1
+            return mapping[old][1]
+
+        # One pass replaces every value
+        new_content, replacements = pattern.subn(substitute, raw)
+        for old, (_, _, old_str, new_str) in mapping.items():
+            if old in counts:
+                lines.append((f"  {filepath.relative_to(ROOT)}: {old_str} → {new_str} ({counts[old]}x)", "CHANGE"))
         
-        return replacements
+        edit = (raw, new_content) if replacements > 0 and not dry_run else None
+        return replacements, lines, edit
     except Exception as e:
-        log(f"Error processing {filepath}: {e}", "ERROR")
-        return 0
+        lines.append((f"Error processing {filepath}: {e}", "ERROR"))
+        return 0, lines, None
 
 def init_snapshot():
     """Initialize snapshot from current theme.json."""
@@ -217,17 +551,59 @@ def apply_theme(dry_run: bool = False):
         log(f"  {key}: {old_val} → {new_val}", "CHANGE")
     
     # Find files to process
-    files = find_config_files()
+    files = find_config_files(persist=not dry_run)
     log(f"\nScanning {len(files)} config files...")
     
     if dry_run:
         log("\n=== DRY RUN MODE ===", "WARN")
     
-    # Apply changes
+    # Longest old values first: distinctive values hit first, and longest-match alternation
+    changes.sort(key=lambda c: -len(str(c[1])))
+
+    # Apply changes, one independent task per file
+    needles = encode_changes(changes)
+    pattern, mapping = build_replacer(needles)
+    worker = functools.partial(apply_replacements, pattern=pattern, mapping=mapping, dry_run=dry_run)
+    workers = min(os.cpu_count() or 1, len(files) // MIN_FILES_PER_WORKER)
+    if workers <= 1:
+        # Too few files to pay for starting a pool
+        _init_worker(needles)
+        results = [worker(filepath) for filepath in files]
+    else:
+        # A few chunks per worker balances load without per-file IPC
+        chunksize = max(1, len(files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(needles,)) as ex:
+            results = list(ex.map(worker, files, chunksize=chunksize))
+
     total_replacements = 0
-    for filepath in files:
-        count = apply_replacements(filepath, changes, dry_run)
+    edits = []
+    for filepath, (count, lines, edit) in zip(files, results):
+        if lines:
+            # One write per file rather than one print per line
+            sys.stdout.write("".join(format_log(msg, level) + "\n" for msg, level in lines))
         total_replacements += count
+        if edit is not None:
+            edits.append((filepath, count, edit))
+
+    # Write changes, after every original is safely archived
+    if edits:
+        archive = backup_files([(filepath, original) for filepath, _, (original, _) in edits])
+        # Atomic writes bump their directory's mtime; track (before first, after last)
+        # write per directory, and None for "before" once anything else touched it
+        stamps: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+        for filepath, count, (_, new_content) in edits:
+            d = os.path.dirname(os.path.realpath(filepath))
+            before = _dir_mtime(d)
+            try:
+                write_atomic(filepath, new_content)
+            except OSError as e:
+                log(f"Error writing {filepath}: {e}", "ERROR")
+                total_replacements -= count
+                stamps[d] = (None, None)
+                continue
+            first, last = stamps.get(d, (before, before))
+            stamps[d] = (first if before == last else None, _dir_mtime(d))
+        refresh_filelist_cache(stamps)
     
     # Summary
     log(f"\n{'Would replace' if dry_run else 'Replaced'} {total_replacements} occurrence(s) across {len(files)} files")
@@ -235,7 +611,7 @@ def apply_theme(dry_run: bool = False):
     if not dry_run and total_replacements > 0:
         save_snapshot(new_theme)
         log(f"✓ Theme applied successfully!")
-        log(f"  Backups saved to: {BACKUP_DIR}")
+        log(f"  Backups saved to: {archive}")
     elif dry_run and total_replacements > 0:
         log("\nRe-run without --dry-run to apply changes.")
 